@@ -1,10 +1,24 @@
-import time
-import threading
-import pandas as pd
-import pandas_ta as ta
+import asyncio
+from datetime import datetime
+import numpy as np
 import logging
-from pybit.unified_trading import HTTP
+from pybit.unified_trading import HTTP, WebSocket
 from key import API_KEY, API_SECRET
+
+try:
+    # Заранее скомпилированное ядро (python build_signals.py) – без JIT при запуске
+    from signals_aot import signals as _signals
+except ImportError:
+    from signals import signals
+    try:
+        from numba import njit
+    except ImportError:  # без numba ядро индикаторов выполняется как обычный Python
+        def njit(*args, **kwargs):
+            if len(args) == 1 and callable(args[0]):
+                return args[0]
+            return lambda func: func
+    _signals = njit(cache=True, fastmath=True)(signals)
+
 # Настройка логирования с повышенной точностью для маленьких значений
 logging.basicConfig(
     level=logging.INFO,
@@ -17,26 +31,41 @@ logging.basicConfig(
 # Список символов для отслеживания
 SYMBOLS = ["OBTUSDT", "PLUMEUSDT"]
 INTERVAL = "1"  # таймфрейм – 1 минута
+INTERVAL_MS = int(INTERVAL) * 60_000  # длительность свечи в миллисекундах
+WINDOW = 20  # окно анализа – 20 свечей (~20 минут)
 INITIAL_BALANCE = 500.0
 
-# Инициализация клиента Bybit
+# Инициализация клиента Bybit – один на все боты, чтобы pybit переиспользовал
+# свой requests.Session (keep-alive) вместо нового соединения на каждый запрос
 client = HTTP(
     testnet=False,
     api_key=API_KEY,
     api_secret=API_SECRET
 )
 
+
 class TradingBot:
     def __init__(self, symbol):
         self.symbol = symbol
         self.demo_balance = INITIAL_BALANCE
         self.position = None
+        # Кольцевой буфер завершенных свечей: отдельный массив на каждое поле OHLCV
+        self.open = np.zeros(WINDOW, dtype=np.float64)
+        self.high = np.zeros(WINDOW, dtype=np.float64)
+        self.low = np.zeros(WINDOW, dtype=np.float64)
+        self.close = np.zeros(WINDOW, dtype=np.float64)
+        self.volume = np.zeros(WINDOW, dtype=np.float64)
+        self.head = 0  # число записанных свечей; позиция записи – head % WINDOW
+        self.last_start = 0  # время открытия последней записанной свечи (мс)
 
-    def get_candle_data(self, limit: int = 20) -> pd.DataFrame:
+    def get_candle_data(self, limit: int = 20):
         """
         Получение исторических данных за последние ~20 минут.
         При таймфрейме 1 минута будет получено 20 свечей.
+        Возвращает массив времени открытия (мс) и массив OHLCV формы (n, 5),
+        самая свежая свеча – в конце.
         """
+        empty = np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
         try:
             response = client.get_kline(
                 category="spot",
@@ -46,66 +75,19 @@ class TradingBot:
             )
             if response['retCode'] != 0:
                 logging.error("[%s] Ошибка API: %s", self.symbol, response['retMsg'])
-                return pd.DataFrame()
-            df = pd.DataFrame(response['result']['list'])
-            df.columns = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'turnover']
-            # Время приходит в миллисекундах
-            df['open_time'] = pd.to_datetime(df['open_time'].astype(int), unit='ms')
-            df.set_index('open_time', inplace=True)
-            numeric_cols = ['open', 'high', 'low', 'close', 'volume']
-            df[numeric_cols] = df[numeric_cols].astype(float)
-            # Переставляем строки, чтобы самая свежая свеча была в конце
-            return df.iloc[::-1].copy()
+                return empty
+            lst = response['result']['list']
+            if not lst:
+                return empty
+            # Формат строки фиксирован: [open_time, open, high, low, close, volume, turnover],
+            # свечи идут от новой к старой – разворачиваем срезом
+            arr = np.array(lst, dtype=object)
+            open_time = arr[::-1, 0].astype(np.int64)
+            ohlcv = arr[::-1, 1:6].astype(np.float64)
+            return open_time, ohlcv
         except Exception as e:
             logging.error("[%s] Ошибка получения данных: %s", self.symbol, e)
-            return pd.DataFrame()
-
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Расчет технических индикаторов для локального анализа:
-          - EMA5 и EMA10 (короткие скользящие средние)
-          - RSI с периодом 7
-          - ROC (процентное изменение цены за 5 свечей)
-        """
-        try:
-            df['ema5'] = ta.ema(df['close'], length=5)
-            df['ema10'] = ta.ema(df['close'], length=10)
-            df['rsi'] = ta.rsi(df['close'], length=7)
-            df['roc'] = ta.roc(df['close'], length=5)
-            return df.dropna()
-        except Exception as e:
-            logging.error("[%s] Ошибка расчета индикаторов: %s", self.symbol, e)
-            return pd.DataFrame()
-
-    def analyze_signals(self, df: pd.DataFrame) -> dict:
-        """
-        Анализ торговых сигналов на основе следующих условий:
-          - Сигнал на покупку:
-              • EMA5 пересекает EMA10 снизу вверх
-              • RSI ниже 40 (локальная перепроданность)
-              • ROC > 1 (рост цены более чем на 1% за 5 свечей)
-          - Сигнал на продажу:
-              • EMA5 пересекает EMA10 сверху вниз
-              • RSI выше 60 (локальная перекупленность)
-              • ROC < -1 (падение цены более чем на 1%)
-        """
-        if len(df) < 2:
-            return {'buy': False, 'sell': False}
-        prev = df.iloc[-2]
-        last = df.iloc[-1]
-        buy_signal = (
-            (prev['ema5'] < prev['ema10']) and
-            (last['ema5'] > last['ema10']) and
-            (last['rsi'] < 40) and
-            (last['roc'] > 1)
-        )
-        sell_signal = (
-            (prev['ema5'] > prev['ema10']) and
-            (last['ema5'] < last['ema10']) and
-            (last['rsi'] > 60) and
-            (last['roc'] < -1)
-        )
-        return {'buy': buy_signal, 'sell': sell_signal}
+            return empty
 
     def execute_buy(self, price: float):
         """Симуляция покупки актива"""
@@ -114,7 +96,7 @@ class TradingBot:
         self.position = {
             'entry_price': price,
             'quantity': self.demo_balance / price,
-            'timestamp': pd.Timestamp.now()
+            'timestamp': datetime.now()
         }
         invested = self.position['quantity'] * price
         self.demo_balance = 0.0
@@ -131,57 +113,111 @@ class TradingBot:
                      self.symbol, price, profit, self.demo_balance)
         self.position = None
 
-    def log_status(self, df: pd.DataFrame):
+    def log_status(self, price, ema5, ema10, rsi, roc):
         """Логирование текущего состояния (цена и индикаторы) с указанием символа"""
-        last = df.iloc[-1]
         logging.info("[%s] STATUS | Price: %.6f | EMA5/10: %.6f/%.6f | RSI: %.2f | ROC: %.6f",
-                     self.symbol, last['close'], last['ema5'], last['ema10'], last['rsi'], last['roc'])
+                     self.symbol, price, ema5, ema10, rsi, roc)
+
+    def add_candle(self, open_, high, low, close, volume):
+        """Запись завершенной свечи в кольцевой буфер поверх самой старой"""
+        pos = self.head % WINDOW
+        self.open[pos] = open_
+        self.high[pos] = high
+        self.low[pos] = low
+        self.close[pos] = close
+        self.volume[pos] = volume
+        self.head += 1
 
-    def run(self):
+    def window(self, series: np.ndarray) -> np.ndarray:
+        """Значения поля буфера в хронологическом порядке (самая свежая свеча – в конце)"""
+        if self.head < WINDOW:
+            return series[:self.head]
+        pos = self.head % WINDOW
+        return np.concatenate((series[pos:], series[:pos]))
+
+    def process_candles(self):
+        """Расчет сигналов по окну завершенных свечей и исполнение сделок"""
+        buy, sell, current_price, ema5, ema10, rsi, roc = _signals(self.window(self.close))
+        if np.isnan(rsi):
+            return
+        self.log_status(current_price, ema5, ema10, rsi, roc)
+        if self.position:
+            if sell:
+                self.execute_sell(current_price)
+        else:
+            if buy:
+                self.execute_buy(current_price)
+
+    def load_history(self):
         """
-        Основной цикл работы торгового бота для данной монеты.
-        Данные обновляются каждую минуту (новая свеча формируется каждые 60 секунд).
-        Анализ ведется на окне из 20 свечей (~20 минут).
+        Заполнение окна завершенными свечами через REST.
+        Буфер очищается, поэтому окно всегда состоит из идущих подряд свечей.
+        """
+        self.head = 0
+        self.last_start = 0
+        open_time, ohlcv = self.get_candle_data(limit=WINDOW + 1)
+        if len(ohlcv) > 1:
+            # Последняя свеча еще формируется – в окно берем только завершенные
+            for row in ohlcv[:-1]:
+                self.add_candle(*row)
+            self.last_start = int(open_time[-2])
+
+    async def on_kline(self, message):
+        """
+        Обработчик сообщений потока kline.
+        Окно обновляется только по завершенной свече (флаг confirm).
+        Если между свечами есть разрыв (переподключение WebSocket),
+        окно заново загружается через REST.
+        """
+        try:
+            for candle in message['data']:
+                if not candle['confirm'] or candle['start'] <= self.last_start:
+                    continue
+                if candle['start'] - self.last_start > INTERVAL_MS:
+                    logging.info("[%s] Пропущены свечи – перезагрузка окна через REST", self.symbol)
+                    await asyncio.to_thread(self.load_history)
+                    if candle['start'] <= self.last_start:
+                        self.process_candles()
+                        continue
+                    if candle['start'] - self.last_start > INTERVAL_MS:
+                        # История недоступна – начинаем окно заново с этой свечи
+                        self.head = 0
+                self.last_start = candle['start']
+                self.add_candle(float(candle['open']), float(candle['high']), float(candle['low']),
+                                float(candle['close']), float(candle['volume']))
+                self.process_candles()
+        except Exception as e:
+            logging.error("[%s] Critical error: %s", self.symbol, e)
+
+    async def run_async(self, ws):
+        """
+        Запуск торгового бота для данной монеты.
+        Сначала подписка на WebSocket, затем загрузка окна из 20 свечей (~20 минут)
+        через REST – свеча, закрывшаяся между этими шагами, не теряется.
+        Далее новые свечи приходят через WebSocket без повторной загрузки.
         """
         logging.info("[%s] Starting trading bot with initial balance: %.2f USD", self.symbol, INITIAL_BALANCE)
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        # pybit вызывает колбэк в потоке WebSocket – передаем сообщения в цикл событий
+        ws.kline_stream(interval=int(INTERVAL), symbol=self.symbol,
+                        callback=lambda message: loop.call_soon_threadsafe(queue.put_nowait, message))
+        await asyncio.to_thread(self.load_history)
         while True:
-            try:
-                raw_data = self.get_candle_data(limit=20)
-                if raw_data.empty:
-                    time.sleep(60)
-                    continue
-                df = self.calculate_indicators(raw_data)
-                if df.empty:
-                    time.sleep(60)
-                    continue
-                signals = self.analyze_signals(df)
-                current_price = df.iloc[-1]['close']
-                self.log_status(df)
-                if self.position:
-                    if signals['sell']:
-                        self.execute_sell(current_price)
-                else:
-                    if signals['buy']:
-                        self.execute_buy(current_price)
-                time.sleep(60)
-            except KeyboardInterrupt:
-                logging.info("[%s] Bot stopped by user", self.symbol)
-                break
-            except Exception as e:
-                logging.error("[%s] Critical error: %s", self.symbol, e)
-                time.sleep(60)
+            await self.on_kline(await queue.get())
 
-if __name__ == "__main__":
+
+async def main():
+    # Один WebSocket на все монеты: свечи приходят push-сообщениями вместо опроса REST
+    ws = await asyncio.to_thread(WebSocket, testnet=False, channel_type="spot")
     # Создаем экземпляры ботов для каждой монеты из списка
     bots = [TradingBot(symbol) for symbol in SYMBOLS]
-    threads = []
-    for bot in bots:
-        t = threading.Thread(target=bot.run, daemon=True)
-        threads.append(t)
-        t.start()
-    # Основной поток остается активным, чтобы не завершились дочерние потоки
+    # Все боты работают в одном цикле событий
+    await asyncio.gather(*(bot.run_async(ws) for bot in bots))
+
+
+if __name__ == "__main__":
     try:
-        while True:
-            time.sleep(1)
+        asyncio.run(main())
     except KeyboardInterrupt:
-        logging.info("Остановка всех ботов по требованию пользователя")
+        logging.info("Остановка всех ботов по требованию пользователя")
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+AOT-компиляция ядра сигналов в модуль signals_aot (signals_aot.so / .pyd).
+Запуск: python build_signals.py. После сборки бот импортирует готовое ядро
+и не тратит время на JIT-компиляцию при старте; numba на целевой машине не нужна.
+"""
+from numba.pycc import CC
+
+from signals import SIGNATURE, signals
+
+cc = CC('signals_aot')
+cc.export('signals', SIGNATURE)(signals)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -1,22 +1,48 @@
-import requests
+import asyncio
+import functools
+import json
+import aiohttp
+try:
+    from orjson import loads as json_loads  # Быстрый разбор JSON (нет сборки под PyPy)
+except ImportError:  # под PyPy и без orjson используем стандартный json
+    json_loads = json.loads
 from bs4 import BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser  # Быстрый HTML-парсер на базе lexbor
+except ImportError:  # без selectolax разбираем страницы через BeautifulSoup
+    HTMLParser = None
 import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from collections import defaultdict
-import pandas as pd
-import time
 from fake_useragent import UserAgent
 import feedparser  # Для парсинга RSS-каналов
+from collections import defaultdict
+try:
+    import ahocorasick  # Автомат Ахо-Корасик для поиска упоминаний
+except ImportError:  # без pyahocorasick ищем упоминания через корзины по первой букве
+    ahocorasick = None
 
-# Загрузка ресурсов NLTK
-nltk.download('vader_lexicon')
-nltk.download('punkt')
+
+def ensure_nltk_resource(path, name):
+    """Загрузка ресурса NLTK только если его еще нет в локальном хранилище"""
+    try:
+        nltk.data.find(path)
+    except LookupError:
+        nltk.download(name, quiet=True)
+
+
+# Загрузка ресурсов NLTK (сеть используется только при первом запуске)
+ensure_nltk_resource('sentiment/vader_lexicon.zip', 'vader_lexicon')
+ensure_nltk_resource('tokenizers/punkt', 'punkt')
 
 # Инициализация анализатора настроений
 analyzer = SentimentIntensityAnalyzer()
 
 # Список криптовалют для анализа (можно расширять динамически)
 CRYPTO_LIST = ['bitcoin', 'ethereum', 'ripple', 'cardano', 'solana', 'polkadot', 'dogecoin', 'litecoin', "melania"]
+# Ограничение размера списка после обновления из CoinMarketCap
+MAX_CRYPTO_LIST = 5000
+# Тот же список в нижнем регистре – приводится один раз при каждом обновлении
+CRYPTO_LIST_LC = [crypto.lower() for crypto in CRYPTO_LIST]
 
 # Список сайтов для парсинга
 NEWS_SOURCES = [
@@ -27,103 +53,232 @@ NEWS_SOURCES = [
     'https://cryptopotato.com/feed/'  # RSS-канал
 ]
 
+# Файл с ETag/Last-Modified и заголовками последних загрузок
+NEWS_CACHE_FILE = 'news_cache.json'
+
 # Инициализация UserAgent
 ua = UserAgent()
 
 
-def fetch_news(url, retries=3):
-    """Получение новостей с сайта или RSS-канала"""
+def load_news_cache():
+    """Загрузка кэша новостей с предыдущего запуска"""
+    try:
+        with open(NEWS_CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_news_cache(cache):
+    """Сохранение кэша новостей для следующего запуска"""
+    try:
+        with open(NEWS_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"Не удалось сохранить кэш новостей: {e}")
+
+
+async def fetch_news(session, url, cache, retries=3):
+    """
+    Асинхронное получение новостей с сайта или RSS-канала.
+    Использует условный GET (If-None-Match/If-Modified-Since): если страница
+    не изменилась, берет заголовки из кэша без загрузки и разбора.
+    В кэше хранятся заголовки до фильтрации по списку криптовалют,
+    поэтому фильтр всегда применяется с актуальным списком.
+    """
+    headers = {
+        'User-Agent': ua.random
+    }
+    is_feed = url.endswith('/feed/')  # Если это RSS-канал
+    cached = cache.get(url)
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
     for attempt in range(retries):
         try:
-            if url.endswith('/feed/'):  # Если это RSS-канал
-                feed = feedparser.parse(url)
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                if response.status == 304 and cached:
+                    return filter_headlines(url, cached['headlines'])
+                if is_feed:
+                    # Кодировку RSS feedparser определяет сам по байтам и XML-заголовку
+                    body = await response.read()
+                    feed_headers = {'content-type': response.headers.get('Content-Type', '')}
+                else:
+                    # Как и requests, заменяем некорректные байты вместо исключения
+                    text = await response.text(errors='replace')
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+
+            if is_feed:
+                # feedparser синхронный, поэтому разбор выносим в пул потоков
+                loop = asyncio.get_running_loop()
+                feed = await loop.run_in_executor(
+                    None, functools.partial(feedparser.parse, body, response_headers=feed_headers))
                 headlines = [entry.title for entry in feed.entries]
             else:  # Если это обычный сайт
-                headers = {
-                    'User-Agent': ua.random
-                }
-                response = requests.get(url, headers=headers, timeout=60)
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                if 'coinmarketcap' in url:
-                    headlines = [item.text.strip() for item in soup.find_all('a', class_='cmc-link') if
-                                 'news' in item.get('href', '')]
-                else:
-                    headlines = [item.text.strip() for item in soup.find_all('a') if
-                                 any(crypto in item.text.lower() for crypto in CRYPTO_LIST)]
+                headlines = parse_headlines(url, text)
 
-            return headlines
-        except requests.exceptions.RequestException as e:
-            print(f"Попытка {attempt + 1} из {retries} не удалась: {e}")
-            time.sleep(10)  # Пауза перед повторной попыткой
+            if etag or last_modified:
+                cache[url] = {'etag': etag, 'last_modified': last_modified, 'headlines': headlines}
+            return filter_headlines(url, headlines)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Попытка {attempt + 1} из {retries} не удалась ({url}): {e}")
+            await asyncio.sleep(10)  # Пауза перед повторной попыткой
     return []  # Возвращаем пустой список, если все попытки неудачны
 
 
+def parse_headlines(url, html):
+    """
+    Извлечение заголовков новостей из HTML-страницы.
+    Для обычных сайтов возвращает тексты всех ссылок – по списку
+    криптовалют их отбирает filter_headlines.
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        if 'coinmarketcap' in url:
+            return [node.text().strip() for node in tree.css('a.cmc-link') if
+                    'news' in (node.attributes.get('href') or '')]
+        titles = (node.text().strip() for node in tree.css('a'))
+    else:
+        soup = BeautifulSoup(html, 'html.parser')
+        if 'coinmarketcap' in url:
+            return [item.text.strip() for item in soup.find_all('a', class_='cmc-link') if
+                    'news' in item.get('href', '')]
+        titles = (item.text.strip() for item in soup.find_all('a'))
+    return [title for title in titles if title]
+
+
+def filter_headlines(url, headlines):
+    """Для обычных сайтов оставляем только ссылки с упоминанием криптовалют"""
+    if url.endswith('/feed/') or 'coinmarketcap' in url:
+        return headlines
+    return [headline for headline in headlines if extract_crypto_mentions(headline.lower())]
+
+
 def analyze_sentiment(text):
     """Анализ настроения текста"""
     return analyzer.polarity_scores(text)['compound']
 
 
-def extract_crypto_mentions(text):
-    """Извлечение упоминаний криптовалют в тексте"""
-    return [crypto for crypto in CRYPTO_LIST if crypto in text.lower()]
+def build_automaton(cryptos):
+    """
+    Построение автомата Ахо-Корасик по списку криптовалют.
+    Без pyahocorasick возвращает корзины {первая буква: [(индекс, название), ...]}.
+    Пустые названия пропускаются в обоих вариантах.
+    """
+    if ahocorasick is None:
+        buckets = defaultdict(list)
+        for idx, crypto in enumerate(cryptos):
+            if crypto:
+                buckets[crypto[0]].append((idx, crypto))
+        return dict(buckets)
+    automaton = ahocorasick.Automaton()
+    for idx, crypto in enumerate(cryptos):
+        if crypto:
+            automaton.add_word(crypto, idx)
+    automaton.make_automaton()
+    return automaton
+
+
+# Автомат для поиска всех криптовалют за один проход по тексту
+AUTOMATON = build_automaton(CRYPTO_LIST_LC)
 
 
-def update_crypto_list():
+def extract_crypto_mentions(text_lc):
+    """
+    Извлечение упоминаний криптовалют в тексте (текст уже в нижнем регистре).
+    Возвращает множество индексов в CRYPTO_LIST_LC.
+    """
+    if ahocorasick is None:
+        # Проверяем только названия, начинающиеся с текущего символа текста
+        found = set()
+        for i, ch in enumerate(text_lc):
+            for idx, crypto in AUTOMATON.get(ch, ()):
+                if text_lc.startswith(crypto, i):
+                    found.add(idx)
+        return found
+    return {idx for _, idx in AUTOMATON.iter(text_lc)}
+
+
+async def update_crypto_list(session):
     """Обновление списка криптовалют (например, из CoinMarketCap)"""
     try:
-        response = requests.get('https://api.coinmarketcap.com/data-api/v3/cryptocurrency/listing', timeout=30)
-        data = response.json()
+        async with session.get('https://api.coinmarketcap.com/data-api/v3/cryptocurrency/listing',
+                               timeout=aiohttp.ClientTimeout(total=30)) as response:
+            data = json_loads(await response.read())
         new_cryptos = [crypto['slug'] for crypto in data['data']['cryptoCurrencyList']]
-        return list(set(CRYPTO_LIST + new_cryptos))  # Объединяем старый и новый список
+        # Объединяем старый и новый список без дублей; новые монеты идут по рангу CoinMarketCap
+        return list(dict.fromkeys(CRYPTO_LIST + new_cryptos))[:MAX_CRYPTO_LIST]
     except Exception as e:
         print(f"Ошибка при обновлении списка криптовалют: {e}")
         return CRYPTO_LIST  # Возвращаем старый список в случае ошибки
 
 
-def main():
-    # Обновляем список криптовалют
-    global CRYPTO_LIST
-    CRYPTO_LIST = update_crypto_list()
-    print(f"Анализируемые криптовалюты: {CRYPTO_LIST}")
+async def main():
+    global CRYPTO_LIST, CRYPTO_LIST_LC, AUTOMATON
+    # Одна сессия на все запросы: пул соединений с keep-alive, TLS-рукопожатие на хост – один раз
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=16)
+    async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': ua.random}) as session:
+        # Обновляем список криптовалют
+        CRYPTO_LIST = await update_crypto_list(session)
+        CRYPTO_LIST_LC = [crypto.lower() for crypto in CRYPTO_LIST]
+        AUTOMATON = build_automaton(CRYPTO_LIST_LC)
+        print(f"Анализируемые криптовалюты: {CRYPTO_LIST}")
+
+        # Параллельный парсинг новостей со всех сайтов
+        print(f"Параллельный парсинг новостей с {len(NEWS_SOURCES)} сайтов: {', '.join(NEWS_SOURCES)}")
+        news_cache = load_news_cache()
+        # Ошибка одного источника не должна отменять результаты остальных
+        fetched = await asyncio.gather(*(fetch_news(session, source, news_cache) for source in NEWS_SOURCES),
+                                       return_exceptions=True)
+    save_news_cache(news_cache)
 
-    # Словарь для хранения результатов
-    crypto_sentiment = defaultdict(list)
+    all_headlines = []
+    for source, headlines in zip(NEWS_SOURCES, fetched):
+        if isinstance(headlines, Exception):
+            print(f"Не удалось получить новости с {source}: {headlines}")
+            continue
+        all_headlines.append(headlines)
 
-    # Парсинг новостей с каждого сайта
-    for source in NEWS_SOURCES:
-        print(f"Парсинг новостей с {source}...")
-        headlines = fetch_news(source)
+    # Сумма настроений и число упоминаний по индексу криптовалюты
+    # (обычные списки: цикл остается чистым Python и ускоряется JIT-компилятором PyPy)
+    sentiment_sum = [0.0] * len(CRYPTO_LIST_LC)
+    mention_count = [0] * len(CRYPTO_LIST_LC)
 
+    for headlines in all_headlines:
         for headline in headlines:
+            # VADER учитывает регистр (CAPS усиливает оценку), поэтому ему передаем исходный заголовок
             sentiment = analyze_sentiment(headline)
-            mentioned_cryptos = extract_crypto_mentions(headline)
+            mentioned_cryptos = extract_crypto_mentions(headline.lower())
 
-            for crypto in mentioned_cryptos:
-                crypto_sentiment[crypto].append(sentiment)
+            for idx in mentioned_cryptos:
+                sentiment_sum[idx] += sentiment
+                mention_count[idx] += 1
 
     # Анализ результатов
     results = []
-    for crypto, sentiments in crypto_sentiment.items():
-        if sentiments:
-            avg_sentiment = sum(sentiments) / len(sentiments)
+    for idx, mentions in enumerate(mention_count):
+        if mentions:
             results.append({
-                'crypto': crypto.capitalize(),
-                'average_sentiment': avg_sentiment,
-                'mentions': len(sentiments)
+                'crypto': CRYPTO_LIST_LC[idx].capitalize(),
+                'average_sentiment': sentiment_sum[idx] / mentions,
+                'mentions': mentions
             })
 
     # Сортировка по среднему настроению и количеству упоминаний
-    results_df = pd.DataFrame(results)
-    results_df = results_df.sort_values(by=['average_sentiment', 'mentions'], ascending=[False, False])
+    results.sort(key=lambda r: (-r['average_sentiment'], -r['mentions']))
 
     # Вывод всех баллов криптоактивов
     print("\nРезультаты анализа:")
-    print(results_df.to_string(index=False))
+    print(f"{'crypto':<12} {'average_sentiment':>17} {'mentions':>8}")
+    for r in results:
+        print(f"{r['crypto']:<12} {r['average_sentiment']:>17.3f} {r['mentions']:>8}")
 
     # Вывод рекомендации
-    if not results_df.empty:
-        best_crypto = results_df.iloc[0]
+    if results:
+        best_crypto = results[0]
         if best_crypto['average_sentiment'] > 0 and best_crypto[
             'mentions'] >= 5:  # Фильтр по минимальному количеству упоминаний
             print("\nРекомендация:")
@@ -138,4 +293,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Ядро расчета индикаторов и торговых сигналов для торгового бота (OBT 20min.py).
+Функция написана в подмножестве Python, которое компилирует numba:
+бот либо JIT-компилирует ее при запуске, либо импортирует заранее
+скомпилированную версию из signals_aot (см. build_signals.py).
+"""
+import numpy as np
+
+# Сигнатура для AOT-компиляции: (buy, sell, last_close, ema5, ema10, rsi, roc)(close)
+SIGNATURE = 'Tuple((b1, b1, f8, f8, f8, f8, f8))(f8[:])'
+
+
+def signals(close):
+    """
+    Расчет индикаторов и торговых сигналов за один проход по ценам закрытия:
+      - EMA5 и EMA10 (старт с SMA первых n свечей, как в pandas_ta)
+      - RSI с периодом 7 (сглаживание по Уайлдеру)
+      - ROC (процентное изменение цены за 5 свечей)
+    Условия сигналов:
+      - Покупка: EMA5 пересекает EMA10 снизу вверх, RSI < 40, ROC > 1
+      - Продажа: EMA5 пересекает EMA10 сверху вниз, RSI > 60, ROC < -1
+    Возвращает (buy, sell, last_close, ema5, ema10, rsi, roc);
+    при недостатке свечей сигналов нет, а индикаторы равны NaN.
+    """
+    n = close.shape[0]
+    if n < 11:
+        return False, False, np.nan, np.nan, np.nan, np.nan, np.nan
+    alpha5 = 2.0 / 6.0
+    alpha10 = 2.0 / 11.0
+    ema5 = 0.0
+    ema10 = 0.0
+    ema5_prev = 0.0
+    ema10_prev = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(n):
+        c = close[i]
+        ema5_prev = ema5
+        ema10_prev = ema10
+        # EMA: накапливаем сумму для стартовой SMA, затем рекуррентное сглаживание
+        if i < 5:
+            ema5 += c
+        if i == 4:
+            ema5 /= 5.0
+        elif i > 4:
+            ema5 += alpha5 * (c - ema5)
+        if i < 10:
+            ema10 += c
+        if i == 9:
+            ema10 /= 10.0
+        elif i > 9:
+            ema10 += alpha10 * (c - ema10)
+        # RSI: средние приросты/потери по Уайлдеру
+        if i > 0:
+            diff = c - close[i - 1]
+            gain = max(diff, 0.0)
+            loss = max(-diff, 0.0)
+            if i <= 7:
+                avg_gain += gain / 7.0
+                avg_loss += loss / 7.0
+            else:
+                avg_gain = (avg_gain * 6.0 + gain) / 7.0
+                avg_loss = (avg_loss * 6.0 + loss) / 7.0
+    total = avg_gain + avg_loss
+    rsi = 100.0 * avg_gain / total if total > 0 else 50.0
+    last_close = close[n - 1]
+    base = close[n - 6]
+    roc = (last_close - base) / base * 100.0
+    # Побитовое & вместо цепочки and – условия вычисляются без ветвлений
+    buy = (np.int8(ema5_prev < ema10_prev) & np.int8(ema5 > ema10) &
+           np.int8(rsi < 40.0) & np.int8(roc > 1.0))
+    sell = (np.int8(ema5_prev > ema10_prev) & np.int8(ema5 < ema10) &
+            np.int8(rsi > 60.0) & np.int8(roc < -1.0))
+    return buy != 0, sell != 0, last_close, ema5, ema10, rsi, roc